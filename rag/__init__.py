@@ -1,3 +1,3 @@
 """Package file for rag package (makes relative imports cleaner)."""
 
-__all__ = ["rag_app", "rag_ingest"]
+__all__ = ["env", "rag_app", "rag_ingest"]
@@ -0,0 +1,51 @@
+"""Carga única de variables de entorno para la app, la ingesta y el validador.
+
+Lee el primer ``.env`` encontrado (directorio actual, raíz del repo o ``rag/``)
+con ``dotenv_values``, sin modificar ``os.environ``. Las variables ya definidas
+en el entorno tienen prioridad sobre las del archivo.
+"""
+import os
+import pathlib
+from typing import Dict, List, Optional
+
+from dotenv import dotenv_values
+
+_RAG_DIR = pathlib.Path(__file__).resolve().parent
+_CANDIDATOS = [pathlib.Path.cwd() / ".env", _RAG_DIR.parent / ".env", _RAG_DIR / ".env"]
+
+ENV_FILE: Optional[pathlib.Path] = next((p for p in _CANDIDATOS if p.exists()), None)
+
+_valores = dotenv_values(ENV_FILE) if ENV_FILE else {}
+ENV: Dict[str, str] = {
+    **{k: v for k, v in _valores.items() if v is not None},
+    **os.environ,
+}
+
+# Credenciales
+PINECONE_API_KEY: Optional[str] = ENV.get("PINECONE_API_KEY")
+GROQ_API_KEY: Optional[str] = ENV.get("GROQ_API_KEY")
+
+# Pinecone
+PINECONE_INDEX: str = ENV.get("PINECONE_INDEX", "cv-alumno")
+PINECONE_CLOUD: str = ENV.get("PINECONE_CLOUD", "aws")
+PINECONE_REGION: str = ENV.get("PINECONE_REGION", "us-east-1")
+
+# Embeddings
+EMBED_BACKEND: str = ENV.get("EMBED_BACKEND", "torch")
+EMBED_ONNX_FILE: str = ENV.get("EMBED_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+EMBED_BF16: bool = ENV.get("EMBED_BF16", "0") == "1"
+EMB_CACHE_PATH: str = ENV.get("EMB_CACHE_PATH", "emb_cache.npz")
+
+REQUIRED = ["PINECONE_API_KEY", "GROQ_API_KEY"]
+
+
+def missing(keys: List[str] = REQUIRED) -> List[str]:
+    """Variables de ``keys`` que no están definidas (o están vacías)."""
+    return [k for k in keys if not ENV.get(k)]
+
+
+def require(keys: List[str] = REQUIRED):
+    """Falla de inmediato si falta alguna de las variables indicadas."""
+    faltantes = missing(keys)
+    if faltantes:
+        raise ValueError(f"❌ Faltan variables de entorno: {', '.join(faltantes)}")
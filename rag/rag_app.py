@@ -1,22 +1,63 @@
+import gc
 import os
-import json
-from typing import List
+import time
+import contextlib
+import asyncio
+import threading
+import textwrap
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 from datetime import datetime, date
 
+import httpx
+import numpy as np
+import orjson
 import streamlit as st
-from groq import Groq
+import torch
+from cachetools import LRUCache, TTLCache
+from groq import AsyncGroq
 from pinecone import Pinecone
 from sentence_transformers import SentenceTransformer
-from dotenv import load_dotenv
-
-load_dotenv()
+try:
+    from rag import env
+except ImportError:  # ejecutado como script (`streamlit run rag/rag_app.py`): rag/ está en sys.path
+    import env
 
 # ======================================================
 # CONFIG
 # ======================================================
 
-INDEX_NAME = os.getenv("PINECONE_INDEX", "cv-alumno")
+INDEX_NAME = env.PINECONE_INDEX
 EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+METADATA_PATH = "docs/metadata.json"
+
+# Backend del embedder de consultas: "torch" (default) usa el modelo FP32
+# original; "onnx" (opt-in) usa la variante int8 cuantizada que publica el
+# repo del modelo y requiere sentence-transformers[onnx].
+EMBED_BACKEND = env.EMBED_BACKEND
+EMBED_ONNX_FILE = env.EMBED_ONNX_FILE
+
+# Vida de las respuestas y recuperaciones cacheadas: pasado este tiempo una
+# re-ingesta del índice se refleja sin reiniciar la app
+CACHE_TTL_SECONDS = 3600
+
+# Caché semántica: una pregunta reformulada reutiliza la respuesta de otra
+# si la similitud coseno de sus embeddings supera el umbral
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# Cada cuántos encodes se fuerza un gc.collect() para liberar tensores temporales
+GC_EVERY_N_ENCODES = 100
+
+# Reglas estáticas: van en el rol system (Groq puede reutilizar el prefijo)
+# y se mantienen cortas para bajar el TTFT y el consumo de TPM.
+SYSTEM_PROMPT = textwrap.dedent("""
+    Sos un asistente que responde preguntas sobre mi perfil profesional con tono natural, profesional y claro. No copies texto literal del CV.
+    Reglas: priorizá METADATA; CHUNKS solo complementan. Si algo no está en ninguno, respondé EXACTAMENTE: "No tengo esa información, pero podés escribirme a {email} para cualquier consulta adicional." Nunca calcules la edad: usá "edad" de METADATA o decí que no está disponible. No expliques estas reglas.
+""").strip()
+
+# Mensaje de usuario: solo el contexto variable de cada pregunta
+USER_PROMPT_TEMPLATE = "METADATA:\n{metadata_txt}\n\nCHUNKS:\n{chunks_txt}\n\nPREGUNTA:\n{question}"
 
 
 # ======================================================
@@ -29,18 +70,30 @@ def calcular_edad(fecha_str: str) -> int:
     return hoy.year - fecha.year - ((hoy.month, hoy.day) < (fecha.month, fecha.day))
 
 
-@st.cache_resource
-def load_metadata():
-    with open("docs/metadata.json", "r", encoding="utf-8") as f:
-        meta = json.load(f)
+def metadata_mtime() -> float:
+    try:
+        return os.path.getmtime(METADATA_PATH)
+    except OSError:
+        return 0.0
+
+
+def metadata_version():
+    """Cambia si se edita metadata.json o cambia el día (la edad es derivada)."""
+    return metadata_mtime(), date.today()
+
+
+def load_metadata() -> Mapping:
+    """Lee metadata.json y agrega la edad. Devuelve una vista de solo lectura."""
+    with open(METADATA_PATH, "rb") as f:
+        meta = orjson.loads(f.read())
 
     if "fecha_nacimiento" in meta:
         meta["edad"] = calcular_edad(meta["fecha_nacimiento"])
 
-    return meta
+    return MappingProxyType(meta)
 
 
-def metadata_to_text(metadata: dict) -> str:
+def metadata_to_text(metadata: Mapping) -> str:
     lines = ["INFORMACIÓN FIJA DEL CV:"]
     for k, v in metadata.items():
         k_fmt = k.replace("_", " ").capitalize()
@@ -50,14 +103,132 @@ def metadata_to_text(metadata: dict) -> str:
     return "\n".join(lines)
 
 
+# ======================================================
+# ESTADO DE PROCESO
+# ======================================================
+
+class SemanticCache:
+    """Banco FIFO de pares (embedding normalizado, respuesta).
+
+    La búsqueda es un único producto matriz-vector sobre a lo sumo ``maxsize``
+    filas. Las filas expiran a los ``ttl`` segundos, igual que la caché exacta
+    de respuestas, y el banco se vacía cuando cambia ``version`` (metadata).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SEMANTIC_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = CACHE_TTL_SECONDS,
+    ):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.version = None
+        self._clear()
+
+    def _clear(self):
+        self.vectors = None
+        self.inserted = np.empty(0)
+        self.answers: List[str] = []
+
+    def _expire(self, version, now: float):
+        if version != self.version:
+            self.version = version
+            self._clear()
+            return
+
+        # Las filas están en orden de inserción: las vencidas son un prefijo
+        n = int(np.searchsorted(self.inserted, now - self.ttl, side="right"))
+        if n:
+            self.vectors = self.vectors[n:] if n < len(self.answers) else None
+            self.inserted = self.inserted[n:]
+            self.answers = self.answers[n:]
+
+    def get(self, q: np.ndarray, version) -> Optional[str]:
+        with self.lock:
+            self._expire(version, time.monotonic())
+            if not self.answers:
+                return None
+            sims = self.vectors @ q
+            best = int(np.argmax(sims))
+            return self.answers[best] if sims[best] >= self.threshold else None
+
+    def add(self, q: np.ndarray, answer: str, version):
+        with self.lock:
+            now = time.monotonic()
+            self._expire(version, now)
+            row = q.astype(np.float32, copy=False)[None, :]
+            self.vectors = row if self.vectors is None else np.vstack([self.vectors, row])[-self.maxsize:]
+            self.inserted = np.append(self.inserted, now)[-self.maxsize:]
+            self.answers = (self.answers + [answer])[-self.maxsize:]
+
+
+class ProcessState:
+    """Estado compartido por todas las sesiones y reruns del proceso.
+
+    Streamlit re-ejecuta este script en cada rerun, así que los globals de
+    módulo se recrean; lo que tiene que sobrevivir entre preguntas vive acá.
+    Las caches evitan repetir el encode y los round-trips a Pinecone / Groq
+    para preguntas ya vistas; los TTL permiten que una re-ingesta del índice
+    se refleje sin reiniciar la app.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.embedder_lock = threading.Lock()
+        self.embedder = None
+        self.embedder_bf16 = False
+        self.encodes = 0
+        self.embed_cache = LRUCache(maxsize=512)
+        self.retrieve_cache = TTLCache(maxsize=1000, ttl=CACHE_TTL_SECONDS)
+        self.answer_cache = TTLCache(maxsize=256, ttl=CACHE_TTL_SECONDS)
+        self.semantic_cache = SemanticCache()
+        self.metadata = None
+        self.metadata_version = None
+        self.system_prompt = None
+        self.metadata_txt = None
+
+    def get_prompt_context(self) -> Tuple[tuple, str, str]:
+        """Devuelve ``(version, system prompt, metadata renderizada)``.
+
+        La metadata se carga una vez por proceso y se relee solo si cambió el
+        archivo o el día (para que la edad no quede desactualizada). Los tres
+        valores se leen juntos bajo el lock, así la respuesta generada con este
+        prompt se cachea bajo la misma versión con la que se construyó.
+        """
+        version = metadata_version()
+        with self.lock:
+            if self.metadata_version != version:
+                self.metadata = load_metadata()
+                self.system_prompt = SYSTEM_PROMPT.format(email=self.metadata.get("email"))
+                self.metadata_txt = metadata_to_text(self.metadata)
+                self.metadata_version = version
+            return self.metadata_version, self.system_prompt, self.metadata_txt
+
+    def cache_get(self, cache, key):
+        with self.lock:
+            return cache.get(key)
+
+    def cache_set(self, cache, key, value):
+        with self.lock:
+            cache[key] = value
+
+
+@st.cache_resource
+def get_state() -> ProcessState:
+    return ProcessState()
+
+
+
 # ======================================================
 # CLIENTS
 # ======================================================
 
 @st.cache_resource
 def get_pinecone():
-    key = os.getenv("PINECONE_API_KEY")
-    return Pinecone(api_key=key)
+    return Pinecone(api_key=env.PINECONE_API_KEY)
 
 
 @st.cache_resource
@@ -65,78 +236,255 @@ def get_index():
     return get_pinecone().Index(INDEX_NAME)
 
 
-@st.cache_resource
+def _load_onnx_embedder():
+    return SentenceTransformer(
+        EMBED_MODEL,
+        backend="onnx",
+        model_kwargs={"file_name": EMBED_ONNX_FILE, "provider": "CPUExecutionProvider"},
+    )
+
+
+def _load_embedder():
+    model = None
+    if EMBED_BACKEND == "onnx":
+        try:
+            model = _load_onnx_embedder()
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar el embedder ONNX int8 ({e}); usando PyTorch FP32")
+
+    bf16 = False
+    if model is None:
+        model = SentenceTransformer(EMBED_MODEL)
+        # Mismo criterio que la ingesta: BF16 solo si se pide con EMBED_BF16=1
+        bf16 = env.EMBED_BF16
+        if bf16:
+            _optimize_bf16(model)
+
+    return model, model.get_sentence_embedding_dimension(), bf16
+
+
+def _optimize_bf16(model: SentenceTransformer):
+    """Optimiza el transformer con IPEX en BF16 si está instalado (CPUs con AMX /
+    AVX-512 BF16). Sin IPEX el encode igual corre con autocast BF16."""
+    try:
+        import intel_extension_for_pytorch as ipex
+    except ImportError:
+        return
+
+    model[0].auto_model = ipex.optimize(model[0].auto_model.eval(), dtype=torch.bfloat16)
+    print("✅ Embedder optimizado con IPEX (BF16)")
+
+
+def _autocast():
+    if get_state().embedder_bf16:
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
 def get_embedder():
-    model = SentenceTransformer(EMBED_MODEL)
-    return model, model.get_sentence_embedding_dimension()
+    """Embedder singleton por proceso: una sola copia de MiniLM aunque haya
+    varias sesiones o reconexiones cargándolo en paralelo."""
+    state = get_state()
+    if state.embedder is None:
+        with state.embedder_lock:
+            if state.embedder is None:
+                model, dim, state.embedder_bf16 = _load_embedder()
+                state.embedder = (model, dim)
+    return state.embedder
+
+
+@st.cache_resource(show_spinner="Preparando el asistente...")
+def warmup_embedder() -> bool:
+    """Forward de prueba al arrancar: la primera pregunta real no paga la carga
+    de pesos ni la inicialización de kernels (una sola vez por proceso)."""
+    model, _ = get_embedder()
+    with _autocast(), torch.no_grad():
+        model.encode("warmup", convert_to_numpy=True, show_progress_bar=False)
+    return True
+
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Event loop persistente (un hilo por proceso) donde vive el cliente async de Groq.
+
+    Se usa un único loop en lugar de asyncio.run por pregunta para que las
+    conexiones keep-alive del cliente no queden atadas a un loop ya cerrado.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="rag-event-loop", daemon=True).start()
+    return loop
+
+
+def run_async(coro):
+    """Ejecuta una corrutina en el loop de fondo y espera su resultado."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
 
 
 @st.cache_resource
 def get_groq():
-    return Groq(api_key=os.getenv("GROQ_API_KEY"))
+    # Un único pool keep-alive (HTTP/2) por proceso: solo la primera request
+    # paga el handshake TLS, el resto reutiliza la conexión.
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+    return AsyncGroq(api_key=env.GROQ_API_KEY, http_client=http_client)
 
 
 # ======================================================
 # RAG
 # ======================================================
 
-def embed(text: str) -> List[float]:
+def normalize_question(text: str) -> str:
+    """Clave canónica de una pregunta: sin espacios extra y en minúsculas."""
+    return " ".join(text.strip().lower().split())
+
+
+def _release_memory(model: SentenceTransformer):
+    """Libera memoria de tensores temporales tras un encode."""
+    if model.device.type == "cuda":
+        torch.cuda.empty_cache()
+
+    state = get_state()
+    with state.lock:
+        state.encodes += 1
+        collect = state.encodes % GC_EVERY_N_ENCODES == 0
+    if collect:
+        gc.collect()
+
+
+def _encode(text_norm: str) -> np.ndarray:
     model, _ = get_embedder()
-    return model.encode(text).tolist()
+    with _autocast(), torch.no_grad():
+        vec = model.encode(
+            text_norm,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+    _release_memory(model)
+    # El array se comparte entre llamadas vía caché: se marca como solo lectura
+    vec.setflags(write=False)
+    return vec
+
+
+def embed(text: str) -> np.ndarray:
+    """Embedding L2-normalizado de la pregunta (coseno == producto punto)."""
+    state = get_state()
+    key = normalize_question(text)
+
+    vec = state.cache_get(state.embed_cache, key)
+    if vec is None:
+        vec = _encode(key)
+        state.cache_set(state.embed_cache, key, vec)
+    return vec
 
 
 def retrieve(question: str, top_k: int = 5):
-    idx = get_index()
-    res = idx.query(vector=embed(question), top_k=top_k, include_metadata=True)
-    return [m["metadata"].get("texto", "") for m in res.get("matches", [])]
+    state = get_state()
+    key = (normalize_question(question), top_k)
 
+    chunks = state.cache_get(state.retrieve_cache, key)
+    if chunks is None:
+        res = get_index().query(vector=embed(question).tolist(), top_k=top_k, include_metadata=True)
+        chunks = tuple(m["metadata"].get("texto", "") for m in res.get("matches", []))
+        state.cache_set(state.retrieve_cache, key, chunks)
+    return list(chunks)
 
-def build_prompt(question: str, chunks: List[str]) -> str:
-    metadata = load_metadata()
-    metadata_txt = metadata_to_text(metadata)
-    email = metadata.get("email")
 
+def build_prompt(question: str, chunks: List[str], metadata_txt: str) -> str:
     chunks_txt = "\n\n---\n\n".join(chunks) if chunks else "No se recuperó información relevante."
 
-    return f"""
-        Eres un asistente que responde preguntas sobre mi perfil profesional a cualquier persona que quiera saber má∫s de mi.
-        Respondé con un tono natural, profesional y claro. No copies texto literal del CV.
+    return USER_PROMPT_TEMPLATE.format(metadata_txt=metadata_txt, chunks_txt=chunks_txt, question=question)
 
-        REGLAS:
-        1. La metadata tiene prioridad absoluta.
-        2. Los chunks solo sirven para complementar, sin copiar.
-        3. Si algo NO está ni en metadata ni en chunks, respondé EXACTAMENTE:
-        "No tengo esa información, pero podés escribirme a {email} para cualquier consulta adicional."
-        4. Está prohibido calcular edad bajo cualquier forma. Si aparece “edad” en metadata, usala. Si no, decí que no está disponible.
-        5. No expliques reglas ni describas cómo funcionás.
 
-        METADATA:
-        {metadata_txt}
+async def prepare_messages(question: str, system_prompt: str, metadata_txt: str) -> List[Dict[str, str]]:
+    """Arma los mensajes para Groq.
 
-        CHUNKS:
-        {chunks_txt}
+    La query a Pinecone es bloqueante: corre en un hilo para no frenar el loop
+    compartido, donde pueden estar transmitiéndose respuestas de otras sesiones.
+    """
+    chunks = await asyncio.to_thread(retrieve, question)
 
-        PREGUNTA:
-        {question}
-        """.strip()
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": build_prompt(question, chunks, metadata_txt)},
+    ]
 
 
-def generate_answer(question: str):
-    client = get_groq()
-    chunks = retrieve(question)
-    prompt = build_prompt(question, chunks)
-
-    resp = client.chat.completions.create(
+async def _stream_tokens(
+    client: AsyncGroq,
+    messages: List[Dict[str, str]],
+    state: ProcessState,
+    key,
+    q_vec: np.ndarray,
+) -> AsyncIterator[str]:
+    """Emite los tokens a medida que llegan y cachea la respuesta completa al final."""
+    resp = await client.chat.completions.create(
         model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": "Sos un asistente profesional."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2,
-        max_tokens=600,
+        messages=messages,
+        # Determinista (= cacheable) y acotado: las respuestas suelen ser de 1–3 oraciones
+        temperature=0,
+        max_tokens=250,
+        stop=["\n\nPREGUNTA:", "\n\nMETADATA:"],
+        stream=True,
     )
 
-    return resp.choices[0].message.content.strip()
+    parts = []
+    try:
+        async for chunk in resp:
+            token = chunk.choices[0].delta.content or ""
+            parts.append(token)
+            yield token
+    finally:
+        # Si el consumidor abandona el stream, se libera la conexión del pool
+        await resp.close()
+
+    # Una respuesta vacía (p. ej. corte inmediato por stop) no se cachea
+    answer = "".join(parts).strip()
+    if answer:
+        state.cache_set(state.answer_cache, key, answer)
+        state.semantic_cache.add(q_vec, answer, version=key[1])
+
+
+def _iter_sync(agen: AsyncIterator[str]) -> Iterator[str]:
+    """Consume un generador async del loop de fondo desde el hilo de Streamlit.
+
+    Si Streamlit interrumpe la iteración (rerun o nueva pregunta), el generador
+    async se cierra explícitamente: sus hooks de finalización no están
+    instalados porque el primer ``__anext__`` no corre dentro del loop.
+    """
+    try:
+        while True:
+            try:
+                yield run_async(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(agen.aclose())
+
+
+def generate_answer(question: str) -> Union[str, Iterator[str]]:
+    """Devuelve la respuesta cacheada (str) o un generador de tokens en streaming."""
+    state = get_state()
+    version, system_prompt, metadata_txt = state.get_prompt_context()
+    key = (normalize_question(question), version)
+
+    cached_answer = state.cache_get(state.answer_cache, key)
+    if cached_answer is not None:
+        return cached_answer
+
+    # El embedding queda cacheado: retrieve() lo reutiliza si no hay acierto
+    q_vec = embed(question)
+    cached_answer = state.semantic_cache.get(q_vec, version=key[1])
+    if cached_answer is not None:
+        return cached_answer
+
+    client = get_groq()
+    messages = run_async(prepare_messages(question, system_prompt, metadata_txt))
+
+    return _iter_sync(_stream_tokens(client, messages, state, key, q_vec))
 
 
 # ======================================================
@@ -155,7 +503,7 @@ def init_state():
 
 
 def submit():
-    st.session_state.submitted = st.session_state[f"user_input_{st.session_state.input_key}"]
+    st.session_state.submitted = st.session_state.get(f"user_input_{st.session_state.input_key}", "")
 
 
 # ======================================================
@@ -169,6 +517,65 @@ def bump_input_key():
     st.session_state.input_key += 1
 
 
+@st.fragment
+def chat_panel():
+    """Historial + input + procesamiento. Al enviar una pregunta solo se
+    re-ejecuta este fragmento; CSS, header y footer no se vuelven a renderizar."""
+    # ---------- CHAT ----------
+    for msg in st.session_state.history:
+        if msg["role"] == "user":
+            st.markdown(f"<div class='chat-user'>{msg['content']}</div>", unsafe_allow_html=True)
+        else:
+            st.markdown(f"<div class='chat-bot'>{msg['content']}</div>", unsafe_allow_html=True)
+
+    # ---------- PROCESAR PREGUNTA ----------
+    # Se procesa antes de dibujar el input: así el input ya sale limpio con el
+    # key nuevo y no hace falta st.rerun (válido tanto en corridas completas
+    # como en corridas del fragmento).
+    if st.session_state.submitted:
+        pregunta = st.session_state.submitted
+        st.session_state.submitted = ""
+
+        st.markdown(f"<div class='chat-user'>{pregunta}</div>", unsafe_allow_html=True)
+
+        with st.spinner("Analizando mi CV..."):
+            answer = generate_answer(pregunta)
+
+        if isinstance(answer, str):
+            st.markdown(f"<div class='chat-bot'>{answer}</div>", unsafe_allow_html=True)
+        else:
+            # Streaming: los tokens se muestran a medida que llegan de Groq y
+            # al terminar se reemplazan por la burbuja con estilo
+            burbuja = st.empty()
+            with burbuja.container():
+                answer = st.write_stream(answer).strip()
+            burbuja.markdown(f"<div class='chat-bot'>{answer}</div>", unsafe_allow_html=True)
+
+        # Guardar en historial
+        st.session_state.history.append({"role": "user", "content": pregunta})
+        st.session_state.history.append({"role": "assistant", "content": answer})
+
+        # 🔥 Limpiar input de forma correcta
+        bump_input_key()
+
+    # ---------- INPUT ----------
+    col1, col2 = st.columns([4, 1])
+
+    with col1:
+        # El input ahora tiene key dinámico → se limpia correctamente
+        st.text_input(
+            "Pregunta:",
+            key=f"user_input_{st.session_state.input_key}",
+            placeholder="Escribí tu pregunta sobre mi experiencia...",
+            label_visibility="collapsed",
+            on_change=submit
+        )
+
+    with col2:
+        # Callback: se ejecuta antes del rerun, igual que on_change del input
+        st.button("Enviar", on_click=submit)
+
+
 def main():
     st.set_page_config(
         layout="centered",
@@ -176,7 +583,13 @@ def main():
         page_icon="💼"
     )
 
+    faltantes = env.missing()
+    if faltantes:
+        st.error(f"Faltan variables de entorno: {', '.join(faltantes)}. Copiá .env.example a .env y completalas.")
+        st.stop()
+
     init_state()
+    warmup_embedder()
 
     # ---------- CSS GLOBAL ----------
     st.markdown("""
@@ -215,50 +628,7 @@ def main():
 
     st.markdown("---")
 
-    # ---------- CHAT ----------
-    for msg in st.session_state.history:
-        if msg["role"] == "user":
-            st.markdown(f"<div class='chat-user'>{msg['content']}</div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div class='chat-bot'>{msg['content']}</div>", unsafe_allow_html=True)
-
-    # ---------- INPUT ----------
-    col1, col2 = st.columns([4, 1])
-
-    with col1:
-        # El input ahora tiene key dinámico → se limpia correctamente
-        st.text_input(
-            "Pregunta:",
-            key=f"user_input_{st.session_state.input_key}",
-            placeholder="Escribí tu pregunta sobre mi experiencia...",
-            label_visibility="collapsed",
-            on_change=submit
-        )
-
-    with col2:
-        sent = st.button("Enviar")
-        if sent:
-            st.session_state.submitted = st.session_state.get(f"user_input_{st.session_state.input_key}", "")
-
-    # ---------- PROCESAR PREGUNTA ----------
-    if st.session_state.submitted:
-        pregunta = st.session_state.submitted
-        st.session_state.submitted = ""
-
-        with st.spinner("Analizando mi CV..."):
-            answer = generate_answer(
-                pregunta
-            )
-
-        # Guardar en historial
-        st.session_state.history.append({"role": "user", "content": pregunta})
-        st.session_state.history.append({"role": "assistant", "content": answer})
-
-        # 🔥 Limpiar input de forma correcta
-        bump_input_key()
-
-        # 🔁 Rerender
-        st.rerun()
+    chat_panel()
 
     # ---------- FOOTER ----------
     st.markdown("<br><br>", unsafe_allow_html=True)
@@ -8,14 +8,21 @@ usando la API.
 
 import os
 import time
-import pdfplumber
+import hashlib
+import contextlib
+import fitz  # PyMuPDF
+import numpy as np
+import torch
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 
 from pinecone import Pinecone, ServerlessSpec
 from sentence_transformers import SentenceTransformer
 
-from dotenv import load_dotenv
-load_dotenv()
+try:
+    from rag import env
+except ImportError:  # ejecutado como script (`python rag/rag_ingest.py`): rag/ está en sys.path
+    import env
 
 
 # =============================================================
@@ -25,12 +32,9 @@ load_dotenv()
 def conectar_pinecone() -> Pinecone:
     """Crea la instancia Pinecone client (serverless)."""
 
-    api_key = os.getenv("PINECONE_API_KEY")
+    env.require(["PINECONE_API_KEY"])
 
-    if not api_key:
-        raise ValueError("❌ PINECONE_API_KEY no está configurada en variables de entorno")
-
-    pc = Pinecone(api_key=api_key)
+    pc = Pinecone(api_key=env.PINECONE_API_KEY)
     print("✅ Cliente Pinecone inicializado correctamente")
 
     return pc
@@ -56,8 +60,8 @@ def crear_indice(pc: Pinecone, nombre_indice: str, dimension: int):
         dimension=dimension,
         metric="cosine",
         spec=ServerlessSpec(
-            cloud=os.getenv("PINECONE_CLOUD", "aws"),
-            region=os.getenv("PINECONE_REGION", "us-east-1"),
+            cloud=env.PINECONE_CLOUD,
+            region=env.PINECONE_REGION,
         ),
     )
 
@@ -79,16 +83,89 @@ def crear_indice(pc: Pinecone, nombre_indice: str, dimension: int):
 class GeneradorEmbeddings:
     """Modelo generador de embeddings."""
 
-    def __init__(self, modelo="sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, modelo="sentence-transformers/all-MiniLM-L6-v2", batch_size=128):
+        self.nombre_modelo = modelo
         self.modelo = SentenceTransformer(modelo)
         self.dimension = self.modelo.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+        # BF16 solo conviene en CPUs con soporte nativo (AVX-512 BF16 / AMX)
+        self.usar_bf16 = env.EMBED_BF16
         print(f"✅ Modelo de embeddings cargado ({self.dimension} dimensiones)")
 
-    def generar(self, texto: str) -> List[float]:
-        return self.modelo.encode(texto).tolist()
+    def _autocast(self):
+        if self.usar_bf16:
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    def generar(self, texto: str) -> np.ndarray:
+        return self.modelo.encode(texto, convert_to_numpy=True, normalize_embeddings=True)
+
+    def generar_lote(self, textos: List[str]) -> np.ndarray:
+        """Matriz (len(textos), dimension) de embeddings L2-normalizados."""
+        with self._autocast():
+            return self.modelo.encode(
+                textos,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+
+
+# -------------------------------------------------------------
+# Cache local de embeddings (hash del chunk -> vector)
+# -------------------------------------------------------------
+
+RUTA_CACHE_EMBEDDINGS = env.EMB_CACHE_PATH
+
+
+def hash_chunk(texto: str, modelo: str, precision: str) -> str:
+    """Hash de contenido del chunk; incluye modelo y precisión (fp32/bf16) para no
+    mezclar vectores calculados de forma distinta."""
+    return hashlib.blake2b(f"{modelo}\0{precision}\0{texto}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cargar_cache_embeddings(ruta: str) -> Dict[str, np.ndarray]:
+    if not os.path.exists(ruta):
+        return {}
+
+    with np.load(ruta) as datos:
+        return dict(zip(datos["ids"].tolist(), datos["vecs"]))
+
+
+def guardar_cache_embeddings(ruta: str, cache: Dict[str, np.ndarray]):
+    if not cache:
+        return
+
+    ids = list(cache)
+    # Vía file handle: np.savez_compressed agregaría ".npz" a una ruta sin esa extensión
+    with open(ruta, "wb") as f:
+        np.savez_compressed(f, ids=np.array(ids), vecs=np.stack([cache[h] for h in ids]))
 
-    def generar_lote(self, textos: List[str]) -> List[List[float]]:
-        return [e.tolist() for e in self.modelo.encode(textos)]
+
+def generar_con_cache(embedder: GeneradorEmbeddings, textos: List[str], ruta: str = RUTA_CACHE_EMBEDDINGS) -> np.ndarray:
+    """Embeddings de ``textos`` reutilizando los ya calculados en corridas anteriores.
+
+    Solo se pasan por el modelo los chunks cuyo hash no está en la cache. La cache
+    se reescribe con los chunks actuales, así no crece con versiones viejas del CV.
+    """
+    cache = cargar_cache_embeddings(ruta)
+    precision = "bf16" if embedder.usar_bf16 else "fp32"
+    hashes = [hash_chunk(t, embedder.nombre_modelo, precision) for t in textos]
+
+    faltantes = [i for i, h in enumerate(hashes) if h not in cache]
+    print(f"♻️ {len(textos) - len(faltantes)}/{len(textos)} embeddings reutilizados de {ruta}")
+
+    if faltantes:
+        nuevos = embedder.generar_lote([textos[i] for i in faltantes])
+        for i, vec in zip(faltantes, nuevos):
+            cache[hashes[i]] = vec
+
+    guardar_cache_embeddings(ruta, {h: cache[h] for h in hashes})
+
+    if not hashes:
+        return np.empty((0, embedder.dimension), dtype=np.float32)
+    return np.stack([cache[h] for h in hashes])
 
 
 # =============================================================
@@ -98,13 +175,8 @@ class GeneradorEmbeddings:
 def cargar_cv_pdf(ruta_pdf: str) -> str:
     """Leer todas las páginas del PDF del CV y extraer su texto."""
 
-    texto = ""
-
-    with pdfplumber.open(ruta_pdf) as pdf:
-        for page in pdf.pages:
-            contenido = page.extract_text()
-            if contenido:
-                texto += contenido + "\n"
+    with fitz.open(ruta_pdf) as doc:
+        texto = "\n".join(page.get_text("text") for page in doc)
 
     texto = texto.strip()
 
@@ -120,25 +192,20 @@ def cargar_cv_pdf(ruta_pdf: str) -> str:
 # =============================================================
 
 def chunkear_texto(texto: str, max_chars=700, overlap=100) -> List[Dict[str, Any]]:
-    """Chunking simple con overlap."""
+    """Chunking simple con overlap.
+
+    Todas las ventanas ``[inicio, fin)`` se calculan de una vez con NumPy;
+    los chunks vacíos se descartan sin consumir índice.
+    """
     texto = texto.replace("\r", "")
-    chunks = []
-    start = 0
-    idx = 0
-
-    while start < len(texto):
-        end = start + max_chars
-        chunk = texto[start:end].strip()
-
-        if chunk:
-            chunks.append({
-                "id": f"cv_chunk_{idx:03d}",
-                "texto": chunk,
-                "seccion": "cv"
-            })
-            idx += 1
+    inicios = np.arange(0, len(texto), max_chars - overlap)
+    fines = np.minimum(inicios + max_chars, len(texto))
 
-        start = end - overlap
+    trozos = [texto[s:e].strip() for s, e in zip(inicios.tolist(), fines.tolist())]
+    chunks = [
+        {"id": f"cv_chunk_{idx:03d}", "texto": chunk, "seccion": "cv"}
+        for idx, chunk in enumerate(t for t in trozos if t)
+    ]
 
     print(f"✂️ Generados {len(chunks)} chunks")
     return chunks
@@ -148,13 +215,17 @@ def chunkear_texto(texto: str, max_chars=700, overlap=100) -> List[Dict[str, Any
 # 6. INGESTAR EN PINECONE
 # =============================================================
 
-def ingestar_cv_en_pinecone(ruta_pdf: str):
-    """Pipeline principal."""
+def ingestar_cv_en_pinecone(ruta_pdf: str, max_upserts_en_vuelo: int = 8):
+    """Pipeline principal.
+
+    Los lotes se suben en paralelo (hasta ``max_upserts_en_vuelo`` requests a la vez),
+    ya que el tiempo de cada upsert está dominado por el round-trip de red.
+    """
     pc = conectar_pinecone()
 
     embedder = GeneradorEmbeddings()
 
-    nombre_indice =os.getenv("PINECONE_INDEX")
+    nombre_indice = env.PINECONE_INDEX
 
     crear_indice(pc, nombre_indice, embedder.dimension)
 
@@ -170,26 +241,33 @@ def ingestar_cv_en_pinecone(ruta_pdf: str):
 
     print(f"🚀 Iniciando ingesta de {total} chunks...")
 
+    # Un único encode para los chunks nuevos; el modelo batchea internamente
+    embeddings = generar_con_cache(embedder, [d["texto"] for d in documentos])
+
+    lotes = []
     for i in range(0, total, batch_size):
         lote = documentos[i:i + batch_size]
-        textos = [d["texto"] for d in lote]
-        embeddings = embedder.generar_lote(textos)
 
         registros = []
-        for j, doc in enumerate(lote):
+        for j, doc in enumerate(lote, start=i):
             registros.append({
                 "id": doc["id"],
-                "values": embeddings[j],
+                "values": embeddings[j].tolist(),
                 "metadata": {
                     "texto": doc["texto"],
                     "seccion": doc["seccion"]
                 }
             })
+        lotes.append(registros)
 
-        index.upsert(vectors=registros)
-        procesados += len(lote)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_upserts_en_vuelo, len(lotes)))) as pool:
+        futuros = {pool.submit(index.upsert, vectors=registros): len(registros) for registros in lotes}
 
-        print(f"   ➜ {procesados}/{total} chunks subidos")
+        for futuro in as_completed(futuros):
+            futuro.result()  # Propaga cualquier error del upsert
+            procesados += futuros[futuro]
+
+            print(f"   ➜ {procesados}/{total} chunks subidos")
 
     print("\n🎉 Ingesta completada correctamente")
     print(index.describe_index_stats())
@@ -207,8 +285,4 @@ if __name__ == "__main__":
         print(f"❌ No se encontró el archivo: {RUTA_CV}")
         exit(1)
 
-    if not os.getenv("PINECONE_API_KEY"):
-        print("❌ Falta la variable de entorno PINECONE_API_KEY")
-        exit(1)
-
-    ingestar_cv_en_pinecone(RUTA_CV, nombre_indice=os.getenv("PINECONE_INDEX"))
\ No newline at end of file
+    ingestar_cv_en_pinecone(RUTA_CV)
\ No newline at end of file